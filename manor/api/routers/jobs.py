@@ -461,7 +461,11 @@ async def run_job(job_id: str):
 
         store = JobStore(settings.homestead_data_dir)
         scheduler = Scheduler(store, settings.homestead_data_dir)
-        success = await scheduler.execute_job(job_id)
+        try:
+            success = await scheduler.execute_job(job_id)
+        finally:
+            await scheduler.stop()
+            store.close()
     except ImportError:
         # Fall back: just mark the run without executing
         now = time.time()
@@ -3,8 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
+import secrets
 import time
-import uuid
 
 
 class ScheduleType(Enum):
@@ -20,14 +20,14 @@ class JobStatus(Enum):
     DISABLED = "disabled"
 
 
-@dataclass
+@dataclass(slots=True)
 class Schedule:
     type: ScheduleType
     expression: str  # cron: "0 9 * * *", interval: "30m", once: ISO timestamp
     timezone: str = "UTC"
 
 
-@dataclass
+@dataclass(slots=True)
 class JobAction:
     """What to do when the job fires."""
     type: str  # "notify", "create_task", "run_command", "webhook"
@@ -37,9 +37,9 @@ class JobAction:
     # run_command: {"command": "...", "cwd": "..."}
 
 
-@dataclass
+@dataclass(slots=True)
 class Job:
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=lambda: secrets.token_hex(16))  # older rows use dashed UUIDs
     name: str = ""
     description: str = ""
     schedule: Schedule | None = None
@@ -2,15 +2,33 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
+import shlex
+import signal
 import sys
 import time
+import urllib.error
+import urllib.request
 from pathlib import Path
 
 from almanac.store import JobStore
 
+_COMMON_PKG = Path(__file__).resolve().parent.parent.parent / "common"
+if str(_COMMON_PKG) not in sys.path:
+    sys.path.insert(0, str(_COMMON_PKG))
+
+from common.outbox import post_message  # noqa: E402
+
+try:
+    import httpx
+except ImportError:  # webhooks fall back to urllib in a worker thread
+    httpx = None
+
 log = logging.getLogger(__name__)
 
-POLL_INTERVAL_SECONDS = 30
+POLL_INTERVAL_SECONDS = 30  # upper bound on sleep between ticks
+MIN_SLEEP_SECONDS = 0.5
+MAX_CONCURRENT_JOBS = 8
 
 
 class Scheduler:
@@ -18,37 +36,45 @@ class Scheduler:
 
     def __init__(self, store: JobStore, homestead_dir: str = "~/.homestead") -> None:
         self._store = store
-        self._homestead_dir = homestead_dir
+        self._hd = Path(homestead_dir).expanduser()
         self._running = False
-        self._outbox_db = str(
-            Path(homestead_dir).expanduser() / "outbox.db"
-        )
+        self._wake = asyncio.Event()
+        self._job_slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+        self._http: httpx.AsyncClient | None = None
+        self._actions = {
+            "outbox": self._action_outbox,
+            "command": self._action_command,
+            "webhook": self._action_webhook,
+        }
+        self._outbox_db = str(self._hd / "outbox.db")
 
     async def run(self) -> None:
         """Main scheduler loop. Runs until stopped or cancelled."""
         self._running = True
         log.info(
-            "Scheduler loop started (poll every %ds)", POLL_INTERVAL_SECONDS
+            "Scheduler loop started (poll at most every %ds)", POLL_INTERVAL_SECONDS
         )
 
         # Log enabled jobs on startup
         try:
             enabled = self._store.list_jobs(enabled_only=True)
             log.info("Loaded %d enabled job(s)", len(enabled))
-            for job in enabled:
-                log.info(
-                    "  - %s (%s / %s) next_run=%s",
-                    job.name,
-                    job.schedule.type.value if job.schedule else "?",
-                    job.action.type if job.action else "?",
-                    job.next_run_at,
-                )
+            if log.isEnabledFor(logging.INFO):
+                for job in enabled:
+                    log.info(
+                        "  - %s (%s / %s) next_run=%s",
+                        job.name,
+                        job.schedule.type.value if job.schedule else "?",
+                        job.action.type if job.action else "?",
+                        job.next_run_at,
+                    )
         except Exception:
             log.exception("Failed to load jobs on startup")
 
         while self._running:
+            marked = False
             try:
-                await self._tick()
+                marked = await self._tick()
             except asyncio.CancelledError:
                 log.info("Scheduler cancelled")
                 break
@@ -56,7 +82,7 @@ class Scheduler:
                 log.exception("Unexpected error in scheduler tick")
 
             try:
-                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+                await self._sleep_until_next(poll_only=not marked)
             except asyncio.CancelledError:
                 log.info("Scheduler sleep cancelled")
                 break
@@ -65,29 +91,69 @@ class Scheduler:
 
     async def stop(self) -> None:
         self._running = False
+        self._wake.set()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _sleep_until_next(self, poll_only: bool = False) -> None:
+        """Sleep until the earliest job is due, capped at the poll interval.
+
+        ``poll_only`` skips the early wake-up, for when the last tick's jobs
+        couldn't be marked and would otherwise be re-run in a tight loop.
+        """
+        delay = float(POLL_INTERVAL_SECONDS)
+        next_at = None
+        if not poll_only:
+            try:
+                next_at = self._store.get_next_fire_time()
+            except Exception:
+                log.exception("Failed to read next fire time")
+        if next_at is not None:
+            delay = max(MIN_SLEEP_SECONDS, min(delay, next_at - time.time()))
+
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def _tick(self) -> bool:
+        """One pass: find due jobs and execute them.
 
-    async def _tick(self) -> None:
-        """One pass: find due jobs and execute them."""
+        Returns False if the jobs ran but couldn't be marked, so they are
+        still due.
+        """
         due_jobs = self._store.get_due_jobs()
         if not due_jobs:
-            return
+            return True
 
         log.info("Found %d due job(s)", len(due_jobs))
 
-        for job in due_jobs:
+        # Jobs are independent and I/O-bound, so run them side by side; a
+        # slow webhook shouldn't hold up every other due job.
+        await asyncio.gather(
+            *(self._run_one(job) for job in due_jobs), return_exceptions=True
+        )
+
+        # Failed jobs are marked too so next_run_at advances and we don't
+        # retry the same failed job every tick forever.
+        try:
+            self._store.mark_runs([job.id for job in due_jobs])
+        except Exception:
+            log.exception("Failed to mark_runs for %d job(s)", len(due_jobs))
+            return False
+        return True
+
+    async def _run_one(self, job) -> None:
+        """Execute one due job's action."""
+        async with self._job_slots:
             try:
                 log.info("Executing job %s (%s)", job.name, job.id)
                 await self._execute_action(job)
-                self._store.mark_run(job.id)
                 log.info("Job %s completed (run #%d)", job.name, job.run_count + 1)
             except Exception:
                 log.exception("Job %s (%s) failed", job.name, job.id)
-                # Still mark the run so next_run_at advances and we don't
-                # retry the same failed job every 30 seconds forever.
-                try:
-                    self._store.mark_run(job.id)
-                except Exception:
-                    log.exception("Failed to mark_run for %s after error", job.id)
 
     async def _execute_action(self, job) -> None:
         """Dispatch to the appropriate action handler."""
@@ -95,17 +161,12 @@ class Scheduler:
             log.warning("Job %s has no action configured", job.id)
             return
 
-        action_type = job.action.type
-        config = job.action.config
+        handler = self._actions.get(job.action.type)
+        if handler is None:
+            log.warning("Unknown action type %r for job %s", job.action.type, job.id)
+            return
 
-        if action_type == "outbox":
-            await self._action_outbox(config)
-        elif action_type == "command":
-            await self._action_command(config)
-        elif action_type == "webhook":
-            await self._action_webhook(config)
-        else:
-            log.warning("Unknown action type %r for job %s", action_type, job.id)
+        await handler(job.action.config)
 
     async def _action_outbox(self, config: dict) -> None:
         """Write a message to the shared outbox for herald to deliver."""
@@ -117,39 +178,35 @@ class Scheduler:
             log.warning("Outbox action missing chat_id or message: %s", config)
             return
 
-        # Import outbox from common package
-        common_pkg = Path(__file__).resolve().parent.parent.parent / "common"
-        if str(common_pkg) not in sys.path:
-            sys.path.insert(0, str(common_pkg))
-
-        from common.outbox import post_message
-
         post_message(
             db_path=self._outbox_db,
             chat_id=int(chat_id),
             agent_name=agent_name,
             message=message,
         )
-        log.info("Posted outbox message to chat %s: %s", chat_id, message[:80])
+        if log.isEnabledFor(logging.INFO):
+            log.info("Posted outbox message to chat %s: %s", chat_id, message[:80])
 
     async def _action_command(self, config: dict) -> None:
         """Run a shell command via asyncio subprocess."""
         command = config.get("command", "")
-        args = config.get("args", [])
+        args = config.get("args") or ()
         timeout = config.get("timeout", 60)
 
         if not command:
             log.warning("Command action has empty command")
             return
 
-        cmd_parts = [command] + list(args)
-        log.info("Running command: %s", " ".join(cmd_parts))
+        if log.isEnabledFor(logging.INFO):
+            log.info("Running command: %s", shlex.join((command, *args)))
 
         try:
             proc = await asyncio.create_subprocess_exec(
-                *cmd_parts,
+                command,
+                *args,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
             )
             stdout, stderr = await asyncio.wait_for(
                 proc.communicate(), timeout=timeout
@@ -164,14 +221,20 @@ class Scheduler:
                 log.warning(
                     "Command exited with code %d, stderr: %s",
                     proc.returncode,
-                    (stderr or b"").decode(errors="replace")[:500],
+                    (stderr or b"")[:500].decode(errors="replace"),
                 )
         except asyncio.TimeoutError:
             log.error("Command timed out after %ds: %s", timeout, command)
+            # The command runs in its own session, so kill the whole group:
+            # children it spawned would otherwise outlive the timeout.
             try:
-                proc.kill()
-            except Exception:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
                 pass
+            try:
+                await asyncio.wait_for(proc.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                log.warning("Command %s did not exit after SIGKILL", command)
 
     async def _action_webhook(self, config: dict) -> None:
         """Send an HTTP request to a URL."""
@@ -186,19 +249,21 @@ class Scheduler:
 
         log.info("Sending %s webhook to %s", method, url)
 
-        try:
-            import urllib.request
-            import urllib.error
-
+        if isinstance(body, (bytes, bytearray)):
+            data = bytes(body) or None
+        else:
             data = body.encode("utf-8") if body else None
-            req = urllib.request.Request(url, data=data, method=method)
 
-            # Default content type for POST with body
-            if data and "Content-Type" not in headers:
-                req.add_header("Content-Type", "application/json")
+        # Default content type for POST with body
+        if data and "Content-Type" not in headers:
+            headers = {**headers, "Content-Type": "application/json"}
 
-            for key, value in headers.items():
-                req.add_header(key, value)
+        if httpx is not None:
+            await self._webhook_httpx(url, method, headers, data)
+            return
+
+        try:
+            req = urllib.request.Request(url, data=data, headers=headers, method=method)
 
             # Run the blocking call in a thread to avoid blocking the loop
             loop = asyncio.get_running_loop()
@@ -216,6 +281,36 @@ class Scheduler:
         except Exception:
             log.exception("Webhook request failed for %s", url)
 
+    def _get_http(self) -> httpx.AsyncClient:
+        """Shared client so repeated webhooks reuse pooled keep-alive connections."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=32),
+                follow_redirects=True,  # match urllib's urlopen fallback
+            )
+        return self._http
+
+    async def _webhook_httpx(
+        self, url: str, method: str, headers: dict, data: bytes | None
+    ) -> None:
+        try:
+            response = await self._get_http().request(
+                method, url, content=data, headers=headers
+            )
+        except Exception:
+            log.exception("Webhook request failed for %s", url)
+            return
+
+        if response.is_error:
+            log.warning(
+                "Webhook HTTP error: %d %s", response.status_code, response.reason_phrase
+            )
+        else:
+            log.info(
+                "Webhook response: %d %s", response.status_code, response.reason_phrase
+            )
+
     async def execute_job(self, job_id: str) -> bool:
         """Manually trigger a single job by ID. Returns True on success."""
         job = self._store.get(job_id)
@@ -1,12 +1,27 @@
 from __future__ import annotations
 
+import calendar
+import functools
 import json
+import logging
 import sqlite3
+import threading
 import time
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
+from typing import Iterator
 
 from almanac.models import Job, JobAction, JobStatus, Schedule, ScheduleType
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+log = logging.getLogger(__name__)
+
+_SCHEDULE_TYPES = {t.value: t for t in ScheduleType}
 
 _CREATE_TABLE = """\
 CREATE TABLE IF NOT EXISTS jobs (
@@ -31,6 +46,45 @@ _CREATE_INDEX = """\
 CREATE INDEX IF NOT EXISTS idx_jobs_next_run ON jobs (enabled, next_run_at)
 """
 
+_UPSERT_JOB = (
+    "INSERT OR REPLACE INTO jobs "
+    "(id, name, description, schedule_type, schedule_value, "
+    "action_type, action_config_json, enabled, last_run_at, "
+    "next_run_at, run_count, created_at, tags_json, source) "
+    "VALUES (:id, :name, :description, :schedule_type, :schedule_value, "
+    ":action_type, :action_config_json, :enabled, :last_run_at, "
+    ":next_run_at, :run_count, :created_at, :tags_json, :source)"
+)
+
+_SELECT_JOB = "SELECT * FROM jobs WHERE id = ?"
+_LIST_JOBS = "SELECT * FROM jobs ORDER BY created_at"
+_LIST_ENABLED_JOBS = "SELECT * FROM jobs WHERE enabled = 1 ORDER BY created_at"
+_DELETE_JOB = "DELETE FROM jobs WHERE id = ?"
+_SELECT_DUE_JOBS = (
+    "SELECT * FROM jobs WHERE enabled = 1 AND next_run_at <= ? "
+    "ORDER BY next_run_at LIMIT ?"
+)
+_SELECT_NEXT_FIRE_TIME = "SELECT MIN(next_run_at) FROM jobs WHERE enabled = 1"
+_SELECT_SCHEDULE = "SELECT schedule_type, schedule_value FROM jobs WHERE id = ?"
+# Takes a JSON array of ids so the statement text is the same for any batch size
+_SELECT_SCHEDULES = (
+    "SELECT id, schedule_type, schedule_value FROM jobs "
+    "WHERE id IN (SELECT value FROM json_each(?))"
+)
+_MARK_RESCHEDULED = (
+    "UPDATE jobs SET last_run_at = ?, run_count = COALESCE(run_count, 0) + 1, "
+    "next_run_at = ? WHERE id = ?"
+)
+_MARK_FINISHED = (
+    "UPDATE jobs SET last_run_at = ?, run_count = COALESCE(run_count, 0) + 1, "
+    "next_run_at = NULL, enabled = 0 WHERE id = ?"
+)
+_ENABLE_JOB = "UPDATE jobs SET enabled = 1, next_run_at = ? WHERE id = ?"
+_DISABLE_JOB = "UPDATE jobs SET enabled = 0 WHERE id = ?"
+
+_OPTIMIZE_INTERVAL_SECONDS = 900
+_BEGIN_RETRIES = 3
+
 
 def _parse_cron_field(field: str, min_val: int, max_val: int) -> list[int]:
     """Parse a single cron field into a list of matching integer values."""
@@ -53,70 +107,163 @@ def _parse_cron_field(field: str, min_val: int, max_val: int) -> list[int]:
         else:
             values.add(int(part))
 
+    if values and (min(values) < min_val or max(values) > max_val):
+        raise ValueError(f"Cron field {field!r} out of range {min_val}-{max_val}")
     return sorted(values)
 
 
-def compute_next_cron(expression: str, after: float | None = None) -> float:
-    """Compute the next timestamp that matches a cron expression.
+def _canonical_field(field: str, min_val: int, max_val: int) -> int | None:
+    """Parse a cron field into a bitmask (bit n set = value n allowed).
 
-    Expression format: minute hour day_of_month month day_of_week
-    Supports: *, ranges (1-5), steps (*/15), lists (1,3,5).
+    Full-range coverage (``*``, ``0-59``, ``1-12,0,10-23`` ...) collapses to
+    None ("any") so the search can skip the field entirely.
     """
-    import calendar
-    from datetime import datetime, timezone
+    values = _parse_cron_field(field, min_val, max_val)
+    if (
+        len(values) == max_val - min_val + 1
+        and values[0] == min_val
+        and values[-1] == max_val
+    ):
+        return None
+    mask = 0
+    for v in values:
+        mask |= 1 << v
+    return mask
 
-    if after is None:
-        after = time.time()
 
+@functools.lru_cache(maxsize=512)
+def _parse_cron(expression: str) -> tuple[int | None, ...]:
+    """Parse a cron expression into per-field bitmasks.
+
+    Cached by expression string: the job list is stable between edits, so
+    every scheduler tick would otherwise re-parse the same expressions.
+    A field that matches every value is None.
+    """
     parts = expression.strip().split()
     if len(parts) != 5:
         raise ValueError(f"Invalid cron expression (need 5 fields): {expression!r}")
 
-    minutes = _parse_cron_field(parts[0], 0, 59)
-    hours = _parse_cron_field(parts[1], 0, 23)
-    days_of_month = _parse_cron_field(parts[2], 1, 31)
-    months = _parse_cron_field(parts[3], 1, 12)
-    days_of_week = _parse_cron_field(parts[4], 0, 6)  # 0=Monday in Python
+    return (
+        _canonical_field(parts[0], 0, 59),
+        _canonical_field(parts[1], 0, 23),
+        _canonical_field(parts[2], 1, 31),
+        _canonical_field(parts[3], 1, 12),
+        _canonical_field(parts[4], 0, 6),  # 0=Monday in Python
+    )
 
-    dt = datetime.fromtimestamp(after, tz=timezone.utc).replace(second=0, microsecond=0)
 
-    # Move one minute forward so we don't match the current minute
-    from datetime import timedelta
-    dt += timedelta(minutes=1)
+def _allows(mask: int | None, v: int) -> bool:
+    return mask is None or bool(mask >> v & 1)
+
 
-    # Search up to 2 years ahead
+def _next_ge(mask: int | None, v: int) -> int | None:
+    """Smallest value allowed by ``mask`` that is >= v, or None on rollover."""
+    if mask is None:
+        return v
+    m = mask >> v
+    if not m:
+        return None
+    return v + (m & -m).bit_length() - 1
+
+
+@functools.lru_cache(maxsize=64)
+def _month_info(year: int, month: int) -> tuple[int, int]:
+    """(weekday of the 1st, number of days) for a month; Monday=0."""
+    return calendar.monthrange(year, month)
+
+
+def _next_day(year: int, month: int, day: int) -> tuple[int, int, int]:
+    if day < _month_info(year, month)[1]:
+        return year, month, day + 1
+    if month < 12:
+        return year, month + 1, 1
+    return year + 1, 1, 1
+
+
+def compute_next_cron(expression: str, after: float | None = None) -> float:
+    """Compute the next timestamp that matches a cron expression.
+
+    Expression format: minute hour day_of_month month day_of_week
+    Supports: *, ranges (1-5), steps (*/15), lists (1,3,5).
+    """
+    if after is None:
+        after = time.time()
+
+    minutes, hours, days_of_month, months, days_of_week = _parse_cron(expression)
+
+    # The search works on plain UTC (year, month, day, hour, minute) ints and
+    # only converts back to a timestamp for the match.
+    # Move one minute forward so we don't match the current minute
+    start = int(after // 60) * 60 + 60
+    year, month, day, hour, minute = time.gmtime(start)[:5]
+
+    # Fast path: for dense schedules (e.g. "*/5 * * * *" re-armed by
+    # mark_run right on a boundary) the very next minute often matches.
+    if (
+        _allows(minutes, minute)
+        and _allows(hours, hour)
+        and _allows(days_of_month, day)
+        and _allows(months, month)
+        and _allows(days_of_week, (_month_info(year, month)[0] + day - 1) % 7)
+    ):
+        return float(start)
+
+    # Search up to 2 years ahead. Each step jumps straight to the next
+    # candidate value of the first field that doesn't match, rather than
+    # walking forward a minute at a time.
     limit = after + 2 * 365 * 86400
-    while dt.timestamp() < limit:
-        if dt.month not in months:
-            # Skip to first day of next month
-            if dt.month == 12:
-                dt = dt.replace(year=dt.year + 1, month=1, day=1, hour=0, minute=0)
-            else:
-                dt = dt.replace(month=dt.month + 1, day=1, hour=0, minute=0)
+    last_year = time.gmtime(limit).tm_year
+    while year <= last_year:
+        next_month = _next_ge(months, month)
+        if next_month is None:
+            # months can't be None here: "any" never rolls over
+            year += 1
+            month = (months & -months).bit_length() - 1
+            day, hour, minute = 1, 0, 0
             continue
-
-        max_day = calendar.monthrange(dt.year, dt.month)[1]
-        if dt.day not in days_of_month or dt.day > max_day:
-            dt += timedelta(days=1)
-            dt = dt.replace(hour=0, minute=0)
+        if next_month != month:
+            month = next_month
+            day, hour, minute = 1, 0, 0
             continue
 
-        # Python weekday: Monday=0 .. Sunday=6
-        if dt.weekday() not in days_of_week:
-            dt += timedelta(days=1)
-            dt = dt.replace(hour=0, minute=0)
+        first_weekday, days_in_month = _month_info(year, month)
+        # The current date is always valid, so an "any" day needs no check
+        if days_of_month is not None:
+            next_day = _next_ge(days_of_month, day)
+            if next_day is None or next_day > days_in_month:
+                # Nothing left this month; start over from the 1st of the next
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                day, hour, minute = 1, 0, 0
+                continue
+            if next_day != day:
+                day, hour, minute = next_day, 0, 0
+
+        if days_of_week is not None and not days_of_week >> (first_weekday + day - 1) % 7 & 1:
+            year, month, day = _next_day(year, month, day)
+            hour, minute = 0, 0
             continue
 
-        if dt.hour not in hours:
-            dt += timedelta(hours=1)
-            dt = dt.replace(minute=0)
+        next_hour = _next_ge(hours, hour)
+        if next_hour is None:
+            year, month, day = _next_day(year, month, day)
+            hour, minute = 0, 0
             continue
+        if next_hour != hour:
+            hour, minute = next_hour, 0
 
-        if dt.minute not in minutes:
-            dt += timedelta(minutes=1)
+        next_minute = _next_ge(minutes, minute)
+        if next_minute is None:
+            if hour < 23:
+                hour, minute = hour + 1, 0
+            else:
+                year, month, day = _next_day(year, month, day)
+                hour, minute = 0, 0
             continue
 
-        return dt.timestamp()
+        ts = calendar.timegm((year, month, day, hour, next_minute, 0))
+        if ts < limit:
+            return float(ts)
+        break
 
     raise ValueError(f"Could not compute next run for cron: {expression!r}")
 
@@ -125,15 +272,15 @@ def compute_next_run(schedule_type: str, schedule_value: str, after: float | Non
     """Compute the next run timestamp for a given schedule."""
     now = after if after is not None else time.time()
 
-    if schedule_type == "cron":
-        return compute_next_cron(schedule_value, after=now)
-
+    # Interval first: it's the most common type and the cheapest to answer
     if schedule_type == "interval":
         interval_seconds = float(schedule_value)
         return now + interval_seconds
 
+    if schedule_type == "cron":
+        return compute_next_cron(schedule_value, after=now)
+
     if schedule_type == "once":
-        from datetime import datetime, timezone
         # ISO datetime string
         try:
             dt = datetime.fromisoformat(schedule_value)
@@ -157,36 +304,84 @@ class JobStore:
         db_dir = Path(homestead_dir).expanduser() / "almanac"
         db_dir.mkdir(parents=True, exist_ok=True)
         self._db_path = db_dir / "jobs.db"
+        # One long-lived connection; the lock serializes callers on other
+        # threads (e.g. a web worker pool sharing the store).
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._last_optimize = 0.0
         self._ensure_schema()
 
-    def _get_conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(self._db_path))
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self._db_path), check_same_thread=False)
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA busy_timeout=5000")
+        # WAL makes NORMAL durable across app crashes; only an OS crash can
+        # lose the last commits, which the scheduler tolerates (jobs re-fire).
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
         conn.row_factory = sqlite3.Row
         return conn
 
+    @contextmanager
+    def _locked(self) -> Iterator[sqlite3.Connection]:
+        """Hold the store lock; roll back anything uncommitted on error."""
+        with self._lock:
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction under the store lock.
+
+        BEGIN IMMEDIATE takes the write lock up front, so a transaction that
+        reads before writing can't fail mid-way on a lock upgrade when manor
+        or the CLI writes concurrently. Commits on success.
+        """
+        with self._locked() as conn:
+            for attempt in range(_BEGIN_RETRIES):
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    break
+                except sqlite3.OperationalError as exc:
+                    if "locked" not in str(exc) or attempt == _BEGIN_RETRIES - 1:
+                        raise
+                    time.sleep(0.05 * 2**attempt)
+            yield conn
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
     def _ensure_schema(self) -> None:
-        conn = self._get_conn()
-        try:
+        with self._write() as conn:
             conn.execute(_CREATE_TABLE)
             conn.execute(_CREATE_INDEX)
-            conn.commit()
-        finally:
-            conn.close()
+        with self._locked() as conn:
+            self._maybe_optimize(conn)
+
+    def _maybe_optimize(self, conn: sqlite3.Connection) -> None:
+        """Refresh planner statistics at most every _OPTIMIZE_INTERVAL_SECONDS."""
+        now = time.time()
+        if now - self._last_optimize < _OPTIMIZE_INTERVAL_SECONDS:
+            return
+        self._last_optimize = now
+        conn.execute("PRAGMA optimize")
 
     def _row_to_job(self, row: sqlite3.Row) -> Job:
         """Convert a database row to a Job dataclass."""
         schedule_type_str = row["schedule_type"]
-        try:
-            stype = ScheduleType(schedule_type_str)
-        except ValueError:
-            stype = ScheduleType.CRON
+        stype = _SCHEDULE_TYPES.get(schedule_type_str, ScheduleType.CRON)
 
         schedule = Schedule(type=stype, expression=row["schedule_value"])
         action = JobAction(
             type=row["action_type"],
-            config=json.loads(row["action_config_json"]),
+            config=_json_loads(row["action_config_json"]),
         )
 
         enabled = bool(row["enabled"])
@@ -208,7 +403,7 @@ class JobStore:
             next_run_at=row["next_run_at"],
             run_count=row["run_count"] or 0,
             created_at=row["created_at"],
-            tags=json.loads(row["tags_json"]) if row["tags_json"] else [],
+            tags=_json_loads(row["tags_json"]) if row["tags_json"] else [],
             source=row["source"] or "almanac",
         )
 
@@ -217,7 +412,9 @@ class JobStore:
         schedule_type = job.schedule.type.value if job.schedule else "cron"
         schedule_value = job.schedule.expression if job.schedule else ""
         action_type = job.action.type if job.action else "command"
-        action_config = json.dumps(job.action.config if job.action else {})
+        # Most jobs have no tags and many no config; skip encoding those
+        config = job.action.config if job.action else None
+        action_config = json.dumps(config) if config else "{}"
         enabled = 1 if job.status in (JobStatus.ACTIVE,) else 0
 
         return {
@@ -233,85 +430,66 @@ class JobStore:
             "next_run_at": job.next_run_at,
             "run_count": job.run_count,
             "created_at": job.created_at,
-            "tags_json": json.dumps(job.tags),
+            "tags_json": json.dumps(job.tags) if job.tags else "[]",
             "source": job.source,
         }
 
     def save(self, job: Job) -> None:
         """Insert or replace a job in the database."""
+        self.save_many([job])
+
+    def save_many(self, jobs: list[Job]) -> None:
+        """Insert or replace several jobs in one transaction."""
         # Compute next_run_at if not set
-        if job.next_run_at is None and job.schedule:
-            job.next_run_at = compute_next_run(
-                job.schedule.type.value, job.schedule.expression
-            )
+        for job in jobs:
+            if job.next_run_at is None and job.schedule:
+                job.next_run_at = compute_next_run(
+                    job.schedule.type.value, job.schedule.expression
+                )
 
-        params = self._job_to_params(job)
-        conn = self._get_conn()
-        try:
-            conn.execute(
-                "INSERT OR REPLACE INTO jobs "
-                "(id, name, description, schedule_type, schedule_value, "
-                "action_type, action_config_json, enabled, last_run_at, "
-                "next_run_at, run_count, created_at, tags_json, source) "
-                "VALUES (:id, :name, :description, :schedule_type, :schedule_value, "
-                ":action_type, :action_config_json, :enabled, :last_run_at, "
-                ":next_run_at, :run_count, :created_at, :tags_json, :source)",
-                params,
-            )
-            conn.commit()
-        finally:
-            conn.close()
+        params = [self._job_to_params(job) for job in jobs]
+        with self._write() as conn:
+            conn.executemany(_UPSERT_JOB, params)
 
     def get(self, job_id: str) -> Job | None:
         """Retrieve a single job by ID."""
-        conn = self._get_conn()
-        try:
-            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        with self._locked() as conn:
+            row = conn.execute(_SELECT_JOB, (job_id,)).fetchone()
             if row is None:
                 return None
             return self._row_to_job(row)
-        finally:
-            conn.close()
 
     def list_jobs(self, enabled_only: bool = False) -> list[Job]:
         """List all jobs, optionally filtering to enabled-only."""
-        conn = self._get_conn()
-        try:
-            if enabled_only:
-                rows = conn.execute(
-                    "SELECT * FROM jobs WHERE enabled = 1 ORDER BY created_at"
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT * FROM jobs ORDER BY created_at"
-                ).fetchall()
+        with self._locked() as conn:
+            self._maybe_optimize(conn)
+            sql = _LIST_ENABLED_JOBS if enabled_only else _LIST_JOBS
+            rows = conn.execute(sql).fetchall()
             return [self._row_to_job(r) for r in rows]
-        finally:
-            conn.close()
 
     def delete(self, job_id: str) -> bool:
         """Delete a job by ID. Returns True if a row was deleted."""
-        conn = self._get_conn()
-        try:
-            cursor = conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
-            conn.commit()
-            return cursor.rowcount > 0
-        finally:
-            conn.close()
+        with self._write() as conn:
+            cursor = conn.execute(_DELETE_JOB, (job_id,))
+        return cursor.rowcount > 0
+
+    def get_due_jobs(self, limit: int = 100) -> list[Job]:
+        """Return enabled jobs whose next_run_at is in the past, oldest first.
 
-    def get_due_jobs(self) -> list[Job]:
-        """Return all enabled jobs whose next_run_at is in the past."""
+        Served by an index range scan on (enabled, next_run_at); ``limit``
+        caps how many jobs a single scheduler tick picks up.
+        """
         now = time.time()
-        conn = self._get_conn()
-        try:
-            rows = conn.execute(
-                "SELECT * FROM jobs WHERE enabled = 1 AND next_run_at <= ? "
-                "ORDER BY next_run_at",
-                (now,),
-            ).fetchall()
+        with self._locked() as conn:
+            self._maybe_optimize(conn)
+            rows = conn.execute(_SELECT_DUE_JOBS, (now, limit)).fetchall()
             return [self._row_to_job(r) for r in rows]
-        finally:
-            conn.close()
+
+    def get_next_fire_time(self) -> float | None:
+        """Return the earliest next_run_at among enabled jobs, or None."""
+        with self._locked() as conn:
+            row = conn.execute(_SELECT_NEXT_FIRE_TIME).fetchone()
+            return row[0]
 
     def mark_run(self, job_id: str) -> None:
         """Record that a job has just been executed.
@@ -319,62 +497,50 @@ class JobStore:
         Updates last_run_at, increments run_count, and computes the next
         run time. For 'once' schedules the job is disabled after running.
         """
-        now = time.time()
-        conn = self._get_conn()
-        try:
-            row = conn.execute(
-                "SELECT schedule_type, schedule_value, run_count FROM jobs WHERE id = ?",
-                (job_id,),
-            ).fetchone()
-            if row is None:
-                return
+        self.mark_runs([job_id])
 
-            schedule_type = row["schedule_type"]
-            schedule_value = row["schedule_value"]
-            new_run_count = (row["run_count"] or 0) + 1
+    def mark_runs(self, job_ids: list[str]) -> None:
+        """Record a batch of executed jobs in a single transaction.
 
-            next_run = compute_next_run(schedule_type, schedule_value, after=now)
+        Same bookkeeping as mark_run, but one commit for the whole batch
+        instead of one per job. A job whose schedule can no longer be
+        computed is recorded and disabled, so it doesn't stay due forever.
+        """
+        if not job_ids:
+            return
 
-            if schedule_type == "once":
-                # One-shot: disable after running
-                conn.execute(
-                    "UPDATE jobs SET last_run_at = ?, run_count = ?, "
-                    "next_run_at = NULL, enabled = 0 WHERE id = ?",
-                    (now, new_run_count, job_id),
-                )
-            else:
-                conn.execute(
-                    "UPDATE jobs SET last_run_at = ?, run_count = ?, "
-                    "next_run_at = ? WHERE id = ?",
-                    (now, new_run_count, next_run, job_id),
-                )
-            conn.commit()
-        finally:
-            conn.close()
+        now = time.time()
+        with self._write() as conn:
+            rows = conn.execute(_SELECT_SCHEDULES, (json.dumps(job_ids),)).fetchall()
+
+            finished: list[tuple] = []
+            rescheduled: list[tuple] = []
+            for row in rows:
+                schedule_type = row["schedule_type"]
+                if schedule_type == "once":
+                    finished.append((now, row["id"]))
+                    continue
+                try:
+                    next_run = compute_next_run(schedule_type, row["schedule_value"], after=now)
+                except ValueError:
+                    log.warning("Cannot compute next run for job %s; disabling it", row["id"])
+                    finished.append((now, row["id"]))
+                    continue
+                rescheduled.append((now, next_run, row["id"]))
+
+            conn.executemany(_MARK_FINISHED, finished)  # one-shot or unschedulable: disable
+            conn.executemany(_MARK_RESCHEDULED, rescheduled)
 
     def toggle(self, job_id: str, enabled: bool) -> bool:
         """Enable or disable a job. Returns True if the job existed."""
-        conn = self._get_conn()
-        try:
+        with self._write() as conn:
             # If re-enabling, recompute next_run_at
             if enabled:
-                row = conn.execute(
-                    "SELECT schedule_type, schedule_value FROM jobs WHERE id = ?",
-                    (job_id,),
-                ).fetchone()
+                row = conn.execute(_SELECT_SCHEDULE, (job_id,)).fetchone()
                 if row is None:
                     return False
                 next_run = compute_next_run(row["schedule_type"], row["schedule_value"])
-                cursor = conn.execute(
-                    "UPDATE jobs SET enabled = 1, next_run_at = ? WHERE id = ?",
-                    (next_run, job_id),
-                )
+                cursor = conn.execute(_ENABLE_JOB, (next_run, job_id))
             else:
-                cursor = conn.execute(
-                    "UPDATE jobs SET enabled = 0 WHERE id = ?",
-                    (job_id,),
-                )
-            conn.commit()
-            return cursor.rowcount > 0
-        finally:
-            conn.close()
+                cursor = conn.execute(_DISABLE_JOB, (job_id,))
+        return cursor.rowcount > 0
@@ -1,15 +1,54 @@
 from __future__ import annotations
 
+import functools
 import sqlite3
 from pathlib import Path
+from typing import Sequence
 
 
 def get_connection(db_path: str | Path) -> sqlite3.Connection:
-    """Open (or create) a SQLite database with WAL mode."""
+    """Open (or create) a SQLite database with WAL mode.
+
+    The connection may be shared across threads; callers that do so are
+    responsible for serializing access.
+    """
     path = Path(db_path)
     path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path))
+    conn = sqlite3.connect(str(path), check_same_thread=False)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA busy_timeout=5000")
+    # WAL + NORMAL only fsyncs at checkpoint time, not on every commit.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA mmap_size=268435456")
     conn.row_factory = sqlite3.Row
     return conn
+
+
+@functools.lru_cache(maxsize=64)
+def _insert_sql(table: str, columns: tuple[str, ...], n_rows: int) -> str:
+    group = "(" + ", ".join("?" * len(columns)) + ")"
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ", ".join([group] * n_rows)
+
+
+def insert_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[Sequence],
+    chunk: int = 500,
+) -> None:
+    """Insert *rows* using multi-row ``VALUES`` statements of up to *chunk* rows.
+
+    Runs inside the caller's transaction; the caller commits.
+    """
+    columns = tuple(columns)
+    # Stay under the bound-parameter limit of the linked SQLite build.
+    chunk = max(1, min(chunk, conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER) // len(columns)))
+    for start in range(0, len(rows), chunk):
+        batch = rows[start:start + chunk]
+        conn.execute(
+            _insert_sql(table, columns, len(batch)),
+            [value for row in batch for value in row],
+        )
@@ -19,13 +19,18 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import queue
+import re
+import sqlite3
+import threading
 import time
 import fnmatch
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Awaitable, Any
+from typing import Callable, Awaitable, Any, Iterable
 
-from common.db import get_connection
+from common.db import get_connection, insert_rows
+from common.models import LazyJSON, RawJSON
 
 log = logging.getLogger(__name__)
 
@@ -44,70 +49,183 @@ _CREATE_INDEX = """\
 CREATE INDEX IF NOT EXISTS idx_events_topic_ts ON events (topic, timestamp)
 """
 
+_EVENT_COLUMNS = ("timestamp", "topic", "source", "payload")
+
+_WRITE_BATCH = 100
+
 
 @dataclass
 class Event:
-    id: int
+    id: int | None  # None until a background writer has persisted it
     timestamp: float
     topic: str
     source: str
-    payload: dict
+    payload: dict = LazyJSON()
     processed: bool = False
 
 
 Handler = Callable[[Event], Awaitable[None]] | Callable[[Event], None]
 
 
+def _is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+def _literal_prefix(pattern: str) -> str:
+    for i, c in enumerate(pattern):
+        if c in "*?[":
+            return pattern[:i]
+    return pattern
+
+
+def _insert_events(conn: sqlite3.Connection, batch: list[tuple[Event, str]]) -> None:
+    """Persist ``(event, payload_json)`` pairs in one transaction and fill in their ids."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        insert_rows(
+            conn, "events", _EVENT_COLUMNS,
+            [(e.timestamp, e.topic, e.source, raw) for e, raw in batch],
+        )
+        # AUTOINCREMENT ids are consecutive while we hold the write lock.
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    first_id = last_id - len(batch) + 1
+    for i, (event, _) in enumerate(batch):
+        event.id = first_id + i
+
+
 class EventBus:
-    def __init__(self, db_path: str | Path = "~/.homestead/events.db") -> None:
+    """Pub/sub bus that persists every event to SQLite.
+
+    With ``background=True`` inserts are handed to a writer thread that
+    commits them in batches; handlers still run inline, but ``Event.id``
+    stays ``None`` until the batch lands (see :meth:`flush`).
+    """
+
+    def __init__(
+        self, db_path: str | Path = "~/.homestead/events.db", background: bool = False
+    ) -> None:
         self._db_path = Path(db_path).expanduser()
         self._conn = get_connection(self._db_path)
         self._conn.execute(_CREATE_TABLE)
         self._conn.execute(_CREATE_INDEX)
         self._conn.commit()
-        self._handlers: dict[str, list[Handler]] = {}
+        # Literal topics dispatch via dict lookup; only wildcards need a scan.
+        self._literal: dict[str, list[Handler]] = {}
+        self._glob: dict[str, tuple[re.Pattern[str], list[Handler]]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._queue: queue.Queue[tuple[Event, str] | None] | None = None
+        self._writer: threading.Thread | None = None
+        if background:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(
+                target=self._write_loop, name="eventbus-writer", daemon=True
+            )
+            self._writer.start()
 
     def subscribe(self, pattern: str, handler: Handler) -> None:
         """Subscribe to events matching a glob pattern (e.g. 'task.*')."""
-        self._handlers.setdefault(pattern, []).append(handler)
+        if not _is_glob(pattern):
+            self._literal.setdefault(pattern, []).append(handler)
+        else:
+            entry = self._glob.get(pattern)
+            if entry is None:
+                entry = self._glob[pattern] = (re.compile(fnmatch.translate(pattern)), [])
+            entry[1].append(handler)
         log.debug("Subscribed to %s", pattern)
 
     def publish(self, topic: str, payload: dict | None = None, source: str = "") -> Event:
         """Publish an event. Persists to DB and notifies matching handlers."""
+        [event] = self.publish_many([(topic, payload)], source=source)
+        return event
+
+    def publish_many(
+        self, events: Iterable[tuple[str, dict | None]], source: str = ""
+    ) -> list[Event]:
+        """Publish several ``(topic, payload)`` events with a single commit."""
         now = time.time()
-        payload = payload or {}
+        batch = []
+        for topic, payload in events:
+            payload = payload or {}
+            event = Event(id=None, timestamp=now, topic=topic, source=source, payload=payload)
+            batch.append((event, json.dumps(payload, separators=(",", ":"), ensure_ascii=False)))
+        if not batch:
+            return []
 
-        cursor = self._conn.execute(
-            "INSERT INTO events (timestamp, topic, source, payload) VALUES (?, ?, ?, ?)",
-            (now, topic, source, json.dumps(payload)),
-        )
-        self._conn.commit()
+        if self._queue is not None:
+            for item in batch:
+                self._queue.put(item)
+        else:
+            _insert_events(self._conn, batch)
 
-        event = Event(
-            id=cursor.lastrowid,
-            timestamp=now,
-            topic=topic,
-            source=source,
-            payload=payload,
-        )
+        published = [event for event, _ in batch]
+        for event in published:
+            self._dispatch(event)
+        return published
+
+    def flush(self) -> None:
+        """Block until every queued event has been written."""
+        if self._queue is not None:
+            self._queue.join()
 
-        # Notify handlers
-        for pattern, handlers in self._handlers.items():
-            if fnmatch.fnmatch(topic, pattern):
+    def close(self) -> None:
+        """Drain the background writer (if any) and close the connection."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        self._conn.close()
+
+    def _write_loop(self) -> None:
+        conn = get_connection(self._db_path)
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < _WRITE_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                running = False
+            items = [item for item in batch if item is not None]
+            try:
+                if items:
+                    _insert_events(conn, items)
+            except Exception:
+                log.exception("Failed to persist %d events", len(items))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def _dispatch(self, event: Event) -> None:
+        topic = event.topic
+        for handler in self._literal.get(topic, ()):
+            self._call(handler, event)
+        for compiled, handlers in self._glob.values():
+            if compiled.match(topic):
                 for handler in handlers:
-                    try:
-                        result = handler(event)
-                        if asyncio.iscoroutine(result):
-                            # Fire and forget for async handlers
-                            loop = asyncio.get_event_loop()
-                            if loop.is_running():
-                                asyncio.ensure_future(result)
-                            else:
-                                loop.run_until_complete(result)
-                    except Exception:
-                        log.exception("Event handler error for %s", topic)
+                    self._call(handler, event)
 
-        return event
+    def _call(self, handler: Handler, event: Event) -> None:
+        try:
+            result = handler(event)
+            if asyncio.iscoroutine(result):
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    asyncio.run(result)
+                else:
+                    # Fire and forget, but keep a reference so the task isn't collected
+                    task = loop.create_task(result)
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+        except Exception:
+            log.exception("Event handler error for %s", event.topic)
 
     def history(
         self,
@@ -117,10 +235,20 @@ class EventBus:
         limit: int = 100,
     ) -> list[Event]:
         """Query event history."""
+        self.flush()
         clauses: list[str] = []
         params: list = []
 
-        if pattern and "*" not in pattern:
+        if pattern and _is_glob(pattern):
+            # GLOB shares fnmatch's syntax except for set negation.
+            clauses.append("topic GLOB ?")
+            params.append(pattern.replace("[!", "[^"))
+            prefix = _literal_prefix(pattern)
+            if prefix:
+                # Explicit bounds let idx_events_topic_ts range-scan the prefix.
+                clauses.append("topic >= ? AND topic < ?")
+                params.extend((prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)))
+        elif pattern:
             clauses.append("topic = ?")
             params.append(pattern)
         if source:
@@ -135,20 +263,16 @@ class EventBus:
         params.append(limit)
 
         rows = self._conn.execute(sql, params).fetchall()
-        events = [self._row_to_event(r) for r in rows]
-
-        # Filter by glob pattern if it contains wildcards
-        if pattern and "*" in pattern:
-            events = [e for e in events if fnmatch.fnmatch(e.topic, pattern)]
-
-        return events
+        return [self._row_to_event(r) for r in rows]
 
     def mark_processed(self, event_id: int) -> None:
+        self.flush()
         self._conn.execute("UPDATE events SET processed = 1 WHERE id = ?", (event_id,))
         self._conn.commit()
 
     def pending(self, topic: str | None = None, limit: int = 50) -> list[Event]:
         """Get unprocessed events."""
+        self.flush()
         if topic:
             rows = self._conn.execute(
                 "SELECT * FROM events WHERE processed = 0 AND topic = ? ORDER BY timestamp LIMIT ?",
@@ -168,6 +292,6 @@ class EventBus:
             timestamp=row["timestamp"],
             topic=row["topic"],
             source=row["source"],
-            payload=json.loads(row["payload"]) if row["payload"] else {},
+            payload=RawJSON(row["payload"]) if row["payload"] else {},
             processed=bool(row["processed"]),
         )
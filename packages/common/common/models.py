@@ -1,7 +1,43 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+import json
 import time
+from typing import Any
+
+
+class RawJSON(str):
+    """Undecoded JSON text read from a database column."""
+
+
+class LazyJSON:
+    """Dataclass field descriptor that decodes a :class:`RawJSON` value on first access.
+
+    Rows can be turned into objects without paying for ``json.loads`` on
+    fields the caller never reads.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, default: Any = _MISSING) -> None:
+        self._default = default
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._attr = f"_{name}"
+
+    def __get__(self, obj: Any, objtype: type | None = None) -> Any:
+        if obj is None:
+            if self._default is LazyJSON._MISSING:
+                raise AttributeError(self._attr[1:])
+            return self._default
+        value = getattr(obj, self._attr)
+        if type(value) is RawJSON:
+            value = json.loads(value)
+            setattr(obj, self._attr, value)
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        setattr(obj, self._attr, value)
 
 
 @dataclass
@@ -20,7 +56,7 @@ class LogEntry:
     level: str
     source: str
     message: str
-    data: dict | None = None
+    data: dict | None = LazyJSON(default=None)
     session_id: str | None = None
     chat_id: int | None = None
     id: int | None = None
@@ -39,14 +75,23 @@ AGENTS: dict[str, AgentIdentity] = {
 }
 
 
+def _prefix(agent: AgentIdentity) -> str:
+    return f"{agent.emoji} <b>{agent.display_name}</b>\n\n"
+
+
+# Prefixes for the built-in agents, computed once at import.
+_PREFIXES: dict[str, str] = {name: _prefix(agent) for name, agent in AGENTS.items()}
+_PREFIXES["herald"] = ""
+
+
 def format_agent_message(agent_name: str, text: str) -> str:
     """Format a message with agent identity prefix.
 
     Default herald messages have no prefix. Other agents get emoji + bold name.
     """
-    if agent_name == "herald":
-        return text
-    agent = AGENTS.get(agent_name)
-    if agent is None:
-        return f"<b>[{agent_name}]</b>\n\n{text}"
-    return f"{agent.emoji} <b>{agent.display_name}</b>\n\n{text}"
+    prefix = _PREFIXES.get(agent_name)
+    if prefix is None:
+        # Agents registered in AGENTS after import, or unknown names.
+        agent = AGENTS.get(agent_name)
+        prefix = _prefix(agent) if agent else f"<b>[{agent_name}]</b>\n\n"
+    return prefix + text
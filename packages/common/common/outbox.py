@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import sqlite3
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable
 
-from common.db import get_connection
+from common.db import get_connection, insert_rows
 
 
 _CREATE_TABLE = """\
@@ -35,12 +38,26 @@ class OutboxMessage:
     created_at: float
 
 
-def _ensure_table(db_path: str | Path) -> None:
-    conn = get_connection(db_path)
-    conn.execute(_CREATE_TABLE)
-    conn.execute(_CREATE_INDEX)
-    conn.commit()
-    conn.close()
+# One connection per outbox database, shared by every caller in the process.
+_CONNS: dict[str, sqlite3.Connection] = {}
+_LOCK = threading.Lock()
+
+
+def _get(db_path: str | Path) -> sqlite3.Connection:
+    """Return the cached connection for *db_path*. Caller must hold ``_LOCK``."""
+    key = str(Path(db_path).expanduser().resolve())
+    conn = _CONNS.get(key)
+    if conn is None:
+        # Schema is created once, when the path is first opened.
+        conn = get_connection(key)
+        conn.execute(_CREATE_TABLE)
+        conn.execute(_CREATE_INDEX)
+        conn.commit()
+        _CONNS[key] = conn
+    return conn
+
+
+_MESSAGE_COLUMNS = ("chat_id", "agent_name", "message", "parse_mode", "created_at")
 
 
 def post_message(
@@ -51,27 +68,38 @@ def post_message(
     parse_mode: str = "HTML",
 ) -> None:
     """Insert a message into the outbox for herald to deliver."""
-    conn = get_connection(db_path)
-    conn.execute(_CREATE_TABLE)
-    conn.execute(
-        "INSERT INTO outbox (chat_id, agent_name, message, parse_mode, created_at) "
-        "VALUES (?, ?, ?, ?, ?)",
-        (chat_id, agent_name, message, parse_mode, time.time()),
-    )
-    conn.commit()
-    conn.close()
+    post_messages(db_path, [(chat_id, agent_name, message, parse_mode)])
+
+
+def post_messages(
+    db_path: str | Path,
+    messages: Iterable[tuple[int, str, str, str]],
+) -> None:
+    """Insert ``(chat_id, agent_name, message, parse_mode)`` rows in one transaction."""
+    now = time.time()
+    rows = [(chat_id, name, msg, mode, now) for chat_id, name, msg, mode in messages]
+    if not rows:
+        return
+    with _LOCK:
+        conn = _get(db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            insert_rows(conn, "outbox", _MESSAGE_COLUMNS, rows)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
 
 
 def get_pending(db_path: str | Path, limit: int = 20) -> list[OutboxMessage]:
     """Fetch pending outbox messages."""
-    conn = get_connection(db_path)
-    conn.execute(_CREATE_TABLE)
-    rows = conn.execute(
-        "SELECT id, chat_id, agent_name, message, parse_mode, created_at "
-        "FROM outbox WHERE status = 'pending' ORDER BY created_at LIMIT ?",
-        (limit,),
-    ).fetchall()
-    conn.close()
+    with _LOCK:
+        conn = _get(db_path)
+        rows = conn.execute(
+            "SELECT id, chat_id, agent_name, message, parse_mode, created_at "
+            "FROM outbox WHERE status = 'pending' ORDER BY created_at LIMIT ?",
+            (limit,),
+        ).fetchall()
     return [
         OutboxMessage(
             id=r["id"],
@@ -87,18 +115,20 @@ def get_pending(db_path: str | Path, limit: int = 20) -> list[OutboxMessage]:
 
 def mark_sent(db_path: str | Path, msg_id: int) -> None:
     """Mark an outbox message as sent."""
-    conn = get_connection(db_path)
-    conn.execute(
-        "UPDATE outbox SET status = 'sent', sent_at = ? WHERE id = ?",
-        (time.time(), msg_id),
-    )
-    conn.commit()
-    conn.close()
+    with _LOCK:
+        conn = _get(db_path)
+        # The connection is shared: roll back on failure so a busy UPDATE
+        # doesn't leave a transaction open for the next caller.
+        with conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'sent', sent_at = ? WHERE id = ?",
+                (time.time(), msg_id),
+            )
 
 
 def mark_failed(db_path: str | Path, msg_id: int) -> None:
     """Mark an outbox message as failed."""
-    conn = get_connection(db_path)
-    conn.execute("UPDATE outbox SET status = 'failed' WHERE id = ?", (msg_id,))
-    conn.commit()
-    conn.close()
+    with _LOCK:
+        conn = _get(db_path)
+        with conn:
+            conn.execute("UPDATE outbox SET status = 'failed' WHERE id = ?", (msg_id,))
@@ -14,6 +14,10 @@ class Skill:
     path: Path
 
 
+def _filename(name: str) -> str:
+    return name.replace(" ", "-").lower() + ".md"
+
+
 class SkillManager:
     """Markdown-file-based skill library.
 
@@ -32,26 +36,43 @@ class SkillManager:
     def __init__(self, skills_dir: str | Path = "~/.homestead/skills") -> None:
         self._dir = Path(skills_dir).expanduser()
         self._dir.mkdir(parents=True, exist_ok=True)
+        # path -> ((mtime_ns, size), parsed skill); re-parsed only when the file changes
+        self._cache: dict[Path, tuple[tuple[int, int], Skill]] = {}
+        self._by_name: dict[str, Path] = {}
 
     def list_skills(self) -> list[Skill]:
+        with os.scandir(self._dir) as it:
+            entries = sorted(
+                (e for e in it if e.name.endswith(".md") and e.is_file()),
+                key=lambda e: e.name,
+            )
         skills: list[Skill] = []
-        for p in sorted(self._dir.glob("*.md")):
-            skill = self._parse(p)
+        for e in entries:
+            try:
+                st = e.stat()
+            except OSError:
+                continue
+            skill = self._load(Path(e.path), st)
             if skill:
                 skills.append(skill)
         return skills
 
     def get(self, name: str) -> Skill | None:
+        # Try the file save() would have written, then any path seen earlier.
+        for path in (self._dir / _filename(name), self._by_name.get(name)):
+            if path is not None:
+                skill = self._load(path)
+                if skill and skill.name == name:
+                    return skill
         for p in self._dir.glob("*.md"):
-            skill = self._parse(p)
+            skill = self._load(p)
             if skill and skill.name == name:
                 return skill
         return None
 
     def save(self, name: str, description: str, content: str, tags: list[str] | None = None) -> Skill:
         tags = tags or []
-        filename = name.replace(" ", "-").lower() + ".md"
-        path = self._dir / filename
+        path = self._dir / _filename(name)
         header = (
             f"---\nname: {name}\n"
             f"description: {description}\n"
@@ -74,6 +95,25 @@ class SkillManager:
 
     # -- internal --------------------------------------------------------------
 
+    def _load(self, path: Path, st: os.stat_result | None = None) -> Skill | None:
+        if st is None:
+            try:
+                st = path.stat()
+            except OSError:
+                self._cache.pop(path, None)
+                return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        skill = self._parse(path)
+        if skill is None:
+            self._cache.pop(path, None)
+            return None
+        self._cache[path] = (key, skill)
+        self._by_name[skill.name] = path
+        return skill
+
     @staticmethod
     def _parse(path: Path) -> Skill | None:
         try:
@@ -4,9 +4,10 @@ import json
 import logging
 import time
 from pathlib import Path
+from typing import Iterable
 
-from common.db import get_connection
-from common.models import LogEntry
+from common.db import get_connection, insert_rows
+from common.models import LogEntry, RawJSON
 
 
 _CREATE_TABLE = """\
@@ -26,6 +27,30 @@ _CREATE_INDEX = """\
 CREATE INDEX IF NOT EXISTS idx_logs_ts_level ON logs (timestamp, level)
 """
 
+# Covers summary() so the aggregate never touches the table itself.
+_CREATE_SUMMARY_INDEX = """\
+CREATE INDEX IF NOT EXISTS idx_logs_ts_src_level ON logs (timestamp, source, level)
+"""
+
+_SUMMARY = """\
+SELECT CASE WHEN instr(source, '.') > 0
+            THEN substr(source, 1, instr(source, '.') - 1)
+            ELSE source END AS src,
+       level, COUNT(*) AS cnt
+FROM logs WHERE timestamp >= ?
+GROUP BY src, level
+"""
+
+_LOG_COLUMNS = ("timestamp", "level", "source", "message", "data_json", "session_id", "chat_id")
+_INSERT_LOG = (
+    "INSERT INTO logs (timestamp, level, source, message, data_json, session_id, chat_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _dumps(data: dict) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
 
 class Watchtower:
     """Structured logging sink backed by SQLite.
@@ -40,6 +65,7 @@ class Watchtower:
         self._conn = get_connection(self._db_path)
         self._conn.execute(_CREATE_TABLE)
         self._conn.execute(_CREATE_INDEX)
+        self._conn.execute(_CREATE_SUMMARY_INDEX)
         self._conn.commit()
 
     # -- write -----------------------------------------------------------------
@@ -52,20 +78,61 @@ class Watchtower:
         data: dict | None = None,
         session_id: str | None = None,
         chat_id: int | None = None,
+        commit: bool = True,
     ) -> None:
+        """Insert one entry; pass ``commit=False`` to defer to :meth:`commit`."""
         self._conn.execute(
-            "INSERT INTO logs (timestamp, level, source, message, data_json, session_id, chat_id) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            _INSERT_LOG,
             (
                 time.time(),
                 level,
                 source,
                 message,
-                json.dumps(data) if data else None,
+                _dumps(data) if data else None,
                 session_id,
                 chat_id,
             ),
         )
+        if commit:
+            self._conn.commit()
+
+    def commit(self) -> None:
+        """Commit entries written with ``commit=False``."""
+        self._conn.commit()
+
+    def log_many(self, entries: Iterable[LogEntry]) -> None:
+        """Write a batch of entries with a single commit.
+
+        Entries still pending from ``log(..., commit=False)`` are committed
+        along with the batch.
+        """
+        rows = [
+            (
+                e.timestamp,
+                e.level,
+                e.source,
+                e.message,
+                _dumps(e.data) if e.data else None,
+                e.session_id,
+                e.chat_id,
+            )
+            for e in entries
+        ]
+        if not rows:
+            return
+        # Deferred log() calls leave an implicit transaction open; join it
+        # rather than failing to BEGIN a nested one.
+        began = not self._conn.in_transaction
+        if began:
+            self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            insert_rows(self._conn, "logs", _LOG_COLUMNS, rows)
+        except BaseException:
+            # A failed INSERT leaves no partial rows, so only roll back a
+            # transaction we started; pending deferred entries are kept.
+            if began:
+                self._conn.rollback()
+            raise
         self._conn.commit()
 
     # -- read ------------------------------------------------------------------
@@ -111,15 +178,9 @@ class Watchtower:
 
     def summary(self, hours: float = 24) -> dict[str, dict[str, int]]:
         since = time.time() - hours * 3600
-        rows = self._conn.execute(
-            "SELECT source, level, COUNT(*) as cnt FROM logs "
-            "WHERE timestamp >= ? GROUP BY source, level ORDER BY source, level",
-            (since,),
-        ).fetchall()
         result: dict[str, dict[str, int]] = {}
-        for row in rows:
-            src = row["source"].split(".")[0]
-            result.setdefault(src, {})[row["level"]] = row["cnt"]
+        for src, level, cnt in self._conn.execute(_SUMMARY, (since,)):
+            result.setdefault(src, {})[level] = cnt
         return result
 
     # -- helpers ---------------------------------------------------------------
@@ -132,7 +193,7 @@ class Watchtower:
             level=row["level"],
             source=row["source"],
             message=row["message"],
-            data=json.loads(row["data_json"]) if row["data_json"] else None,
+            data=RawJSON(row["data_json"]) if row["data_json"] else None,
             session_id=row["session_id"],
             chat_id=row["chat_id"],
         )
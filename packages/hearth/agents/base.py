@@ -78,22 +78,18 @@ class BaseAgent(ABC):
         Returns:
             AgentResponse with content and usage info
         """
-        messages = []
-        
         # Build system prompt
         if include_identity:
             system = self.identity.build_system_prompt()
         else:
             system = "You are a helpful assistant."
         
-        messages.append({"role": "system", "content": system})
-        
-        # Add context/history
-        if context:
-            messages.extend(context)
-        
-        # Add current message
-        messages.append({"role": "user", "content": message})
+        # System prompt, history, then the current message
+        messages = [
+            {"role": "system", "content": system},
+            *(context or ()),
+            {"role": "user", "content": message},
+        ]
         
         # Call API
         response = self._call_api(messages, max_tokens, temperature)
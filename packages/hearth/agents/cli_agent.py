@@ -7,15 +7,47 @@ Supports Claude Pro/Max subscriptions (no per-token costs).
 
 import json
 import logging
+import os
 import re
 import subprocess
+import threading
 from abc import abstractmethod
 from typing import Optional, List, Dict, Any
 
 from .base import BaseAgent, AgentResponse
 
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# `claude --version` starts a Node process, so the check runs once per process.
+# Only success is remembered; a failed check is retried by the next agent.
+_cli_verified = False
+_cli_verify_lock = threading.Lock()
+
+# Matches ```tool_use fenced blocks in agent responses
+_TOOL_USE_RE = re.compile(r'```tool_use\s*\n(.*?)\n```', re.DOTALL)
+
+
+def _json_loads(data):
+    """Parse JSON with orjson when installed (its errors subclass json.JSONDecodeError)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps_indented(obj) -> str:
+    """Pretty-print *obj* for tool results fed back into the prompt."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # e.g. ints wider than 64 bits; let stdlib json decide
+    return json.dumps(obj, indent=2)
+
 
 class CLIAgent(BaseAgent):
     """
@@ -28,6 +60,9 @@ class CLIAgent(BaseAgent):
     def __init__(self, config: Optional['Config'] = None):
         super().__init__(config)
         self._verify_cli_available()
+        # Tool definitions are static per name, so the rendered tool system
+        # prompt is cached by the tuple of tool names
+        self._system_prompt_cache: Dict[tuple, str] = {}
 
     @property
     @abstractmethod
@@ -41,8 +76,22 @@ class CLIAgent(BaseAgent):
         """Return timeout in seconds for CLI calls."""
         pass
 
-    def _verify_cli_available(self):
-        """Verify Claude CLI is installed and accessible."""
+    @classmethod
+    def _verify_cli_available(cls):
+        """Verify Claude CLI is installed and accessible.
+
+        Set HEARTH_SKIP_CLI_CHECK=1 to bypass the check (e.g. in tests).
+        """
+        global _cli_verified
+        if _cli_verified or os.environ.get("HEARTH_SKIP_CLI_CHECK") == "1":
+            return
+        with _cli_verify_lock:
+            if not _cli_verified:
+                cls._run_cli_check()
+                _cli_verified = True
+
+    @staticmethod
+    def _run_cli_check():
         try:
             result = subprocess.run(
                 ["claude", "--version"],
@@ -90,40 +139,28 @@ class CLIAgent(BaseAgent):
         Returns:
             Formatted prompt string
         """
-        sections = []
-
-        # Extract and format system message
+        # Single pass: each non-system message joins the history once the
+        # next one arrives; whatever is left at the end is the current message
         system_msg = None
-        other_messages = []
+        history = []
+        current = None
         for msg in messages:
             if msg["role"] == "system":
                 system_msg = msg["content"]
-            else:
-                other_messages.append(msg)
+                continue
+            if current is not None:
+                history.append(f"[{current['role'].upper()}]: {current['content']}")
+            current = msg
 
+        sections = []
         if system_msg:
+            sections.append(f"<SYSTEM INSTRUCTIONS>\n{system_msg}\n</SYSTEM INSTRUCTIONS>")
+        if history:
             sections.append(
-                f"<SYSTEM INSTRUCTIONS>\n{system_msg}\n</SYSTEM INSTRUCTIONS>"
-            )
-
-        # Format conversation history (all but last message)
-        if len(other_messages) > 1:
-            history = []
-            for msg in other_messages[:-1]:
-                role = msg["role"].upper()
-                content = msg["content"]
-                history.append(f"[{role}]: {content}")
-            sections.append(
-                f"<CONVERSATION HISTORY>\n" + "\n\n".join(history) +
-                f"\n</CONVERSATION HISTORY>"
-            )
-
-        # Current message
-        if other_messages:
-            current = other_messages[-1]["content"]
-            sections.append(
-                f"<CURRENT MESSAGE>\n{current}\n</CURRENT MESSAGE>"
+                "<CONVERSATION HISTORY>\n" + "\n\n".join(history) + "\n</CONVERSATION HISTORY>"
             )
+        if current is not None:
+            sections.append(f"<CURRENT MESSAGE>\n{current['content']}\n</CURRENT MESSAGE>")
 
         return "\n\n".join(sections)
 
@@ -158,22 +195,24 @@ class CLIAgent(BaseAgent):
         logger.debug(f"Prompt length: {len(prompt)} chars, timeout: {self.cli_timeout}s")
 
         try:
+            # Work in bytes: the JSON parser takes stdout directly, without
+            # decoding the whole response to str first
             result = subprocess.run(
                 cmd,
-                input=prompt,
+                input=prompt.encode("utf-8"),
                 capture_output=True,
-                text=True,
                 timeout=self.cli_timeout,
                 shell=False,  # Security: never use shell=True
             )
 
             if result.returncode != 0:
-                error_msg = result.stderr.strip() or "Unknown error"
+                stderr = result.stderr.decode("utf-8", errors="replace")
+                error_msg = stderr.strip() or "Unknown error"
                 raise RuntimeError(f"Claude CLI failed (exit {result.returncode}): {error_msg}")
 
             # Parse JSON response
             try:
-                response_data = json.loads(result.stdout)
+                response_data = _json_loads(result.stdout)
                 content = self._extract_content(response_data)
                 input_tokens, output_tokens = self._extract_tokens(response_data)
 
@@ -186,7 +225,7 @@ class CLIAgent(BaseAgent):
                 # Fallback: use raw stdout as content
                 logger.warning(f"Failed to parse CLI JSON response: {e}")
                 logger.warning("Using raw output as content")
-                content = result.stdout
+                content = result.stdout.decode("utf-8", errors="replace")
                 # Estimate tokens (rough approximation: 4 chars ≈ 1 token)
                 input_tokens = len(prompt) // 4
                 output_tokens = len(content) // 4
@@ -258,10 +297,9 @@ class CLIAgent(BaseAgent):
             Tuple of (input_tokens, output_tokens)
         """
         try:
-            # Try usage field first (Claude CLI standard format)
-            if "usage" in json_response:
-                usage = json_response["usage"]
-                # Sum all input token types
+            # Usage field (CLI standard and Anthropic API style): sum all input token types
+            usage = json_response.get("usage")
+            if usage is not None:
                 input_tokens = (
                     usage.get("input_tokens", 0) +
                     usage.get("cache_read_input_tokens", 0) +
@@ -273,20 +311,11 @@ class CLIAgent(BaseAgent):
                     return input_tokens, output_tokens
 
             # Try context_window structure (alternative format)
-            if "context_window" in json_response:
-                ctx = json_response["context_window"]
+            ctx = json_response.get("context_window")
+            if ctx is not None:
                 input_tokens = ctx.get("total_input_tokens", 0)
                 output_tokens = ctx.get("total_output_tokens", 0)
 
-                if input_tokens > 0 and output_tokens > 0:
-                    return input_tokens, output_tokens
-
-            # Try usage structure (Anthropic API style)
-            if "usage" in json_response:
-                usage = json_response["usage"]
-                input_tokens = usage.get("input_tokens", 0)
-                output_tokens = usage.get("output_tokens", 0)
-
                 if input_tokens > 0 and output_tokens > 0:
                     return input_tokens, output_tokens
         except (KeyError, AttributeError, TypeError) as e:
@@ -384,31 +413,12 @@ class CLIAgent(BaseAgent):
         """
         from core import tools as tools_module
 
-        # Build tool documentation for system prompt
-        tool_docs = self._format_tool_docs(tools)
-
         # Create system message with tool instructions
-        system_message = f"""You are an AI assistant with access to the following tools:
-
-{tool_docs}
-
-To use a tool, output a JSON block in this exact format:
-
-```tool_use
-{{
-  "tool": "tool_name",
-  "input": {{
-    "param1": "value1",
-    "param2": "value2"
-  }}
-}}
-```
-
-You can use multiple tools by outputting multiple ```tool_use blocks.
-After tool results are provided, continue the conversation naturally.
-
-IMPORTANT: Only use tools when necessary. For simple questions, just respond directly.
-"""
+        tools_key = tuple(t.get("name", "unknown") for t in tools)
+        system_message = self._system_prompt_cache.get(tools_key)
+        if system_message is None:
+            system_message = self._build_tool_system_prompt(tools)
+            self._system_prompt_cache[tools_key] = system_message
 
         # Build messages list
         messages = []
@@ -473,7 +483,7 @@ IMPORTANT: Only use tools when necessary. For simple questions, just respond dir
 
             # Format tool results for next turn
             tool_results_text = "\n\n".join([
-                f"Tool: {tr['tool']}\nResult: {json.dumps(tr['result'], indent=2)}"
+                f"Tool: {tr['tool']}\nResult: {_json_dumps_indented(tr['result'])}"
                 for tr in tool_results
             ])
 
@@ -493,6 +503,32 @@ IMPORTANT: Only use tools when necessary. For simple questions, just respond dir
             metadata={"cli": True, "tool_turns": turn_count, "max_turns_reached": True}
         )
 
+    def _build_tool_system_prompt(self, tools: List[Dict[str, Any]]) -> str:
+        """Render the system prompt that documents *tools* and the tool_use format."""
+        tool_docs = self._format_tool_docs(tools)
+
+        return f"""You are an AI assistant with access to the following tools:
+
+{tool_docs}
+
+To use a tool, output a JSON block in this exact format:
+
+```tool_use
+{{
+  "tool": "tool_name",
+  "input": {{
+    "param1": "value1",
+    "param2": "value2"
+  }}
+}}
+```
+
+You can use multiple tools by outputting multiple ```tool_use blocks.
+After tool results are provided, continue the conversation naturally.
+
+IMPORTANT: Only use tools when necessary. For simple questions, just respond directly.
+"""
+
     def _format_tool_docs(self, tools: List[Dict[str, Any]]) -> str:
         """Format tool definitions as documentation string."""
         docs = []
@@ -535,12 +571,11 @@ Parameters:
         tool_calls = []
 
         # Find all ```tool_use blocks
-        pattern = r'```tool_use\s*\n(.*?)\n```'
-        matches = re.findall(pattern, content, re.DOTALL)
+        matches = _TOOL_USE_RE.findall(content)
 
         for match in matches:
             try:
-                tool_call = json.loads(match.strip())
+                tool_call = _json_loads(match.strip())
                 if "tool" in tool_call:
                     tool_calls.append(tool_call)
                 else:
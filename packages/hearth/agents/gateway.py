@@ -4,6 +4,8 @@ The orchestrator that routes messages and manages the entity.
 """
 
 from typing import Optional, Dict, Any, List
+from collections import deque
+from itertools import islice
 from datetime import datetime
 from dataclasses import dataclass
 import logging
@@ -54,8 +56,9 @@ class Gateway:
         # Get configured main agent (default: sonnet)
         self.main_agent_type = self.config.get("chat.main_agent", "sonnet")
 
-        # Session history (in-memory, per-session persistence via state)
-        self._session_histories: Dict[str, List[dict]] = {}
+        # Session history (in-memory, per-session persistence via state).
+        # Bounded deques drop the oldest turns without re-slicing the list.
+        self._session_histories: Dict[str, deque] = {}
     
     def process(
         self,
@@ -275,21 +278,19 @@ I should probably wait until I've had a week or two of reflections before naming
     
     def _get_history(self, session_id: str, limit: int = 10) -> List[dict]:
         """Get conversation history for a session."""
-        if session_id not in self._session_histories:
-            self._session_histories[session_id] = []
-        return self._session_histories[session_id][-limit:]
+        history = self._session_histories.get(session_id)
+        if not history:
+            return []
+        return list(islice(history, max(0, len(history) - limit), None))
     
     def _update_history(self, session_id: str, user_msg: str, assistant_msg: str):
-        """Update conversation history."""
-        if session_id not in self._session_histories:
-            self._session_histories[session_id] = []
+        """Update conversation history (keeps the most recent 50 messages)."""
+        history = self._session_histories.get(session_id)
+        if history is None:
+            history = self._session_histories[session_id] = deque(maxlen=50)
         
-        self._session_histories[session_id].append({"role": "user", "content": user_msg})
-        self._session_histories[session_id].append({"role": "assistant", "content": assistant_msg})
-        
-        # Trim to prevent unbounded growth
-        if len(self._session_histories[session_id]) > 50:
-            self._session_histories[session_id] = self._session_histories[session_id][-30:]
+        history.append({"role": "user", "content": user_msg})
+        history.append({"role": "assistant", "content": assistant_msg})
     
     def trigger_reflection(self) -> str:
         """Manually trigger reflection."""
@@ -0,0 +1,256 @@
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "packages" / "almanac"))
+
+from almanac import scheduler as scheduler_module
+from almanac.models import Job, JobAction, JobStatus, Schedule, ScheduleType
+from almanac.scheduler import Scheduler
+from almanac.store import JobStore
+
+
+def _job(name: str, action_type: str = "command", **config) -> Job:
+    return Job(
+        name=name,
+        schedule=Schedule(type=ScheduleType.INTERVAL, expression="60"),
+        action=JobAction(type=action_type, config=config),
+        next_run_at=time.time() - 1,
+    )
+
+
+def test_tick_runs_due_jobs_concurrently(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    for i in range(3):
+        store.save(_job(f"job{i}"))
+
+    scheduler = Scheduler(store, str(tmp_dir))
+    active = 0
+    peak = 0
+
+    async def slow_action(job):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+
+    scheduler._execute_action = slow_action
+    asyncio.run(scheduler._tick())
+
+    assert peak == 3
+    assert store.get_due_jobs() == []
+    assert all(j.run_count == 1 for j in store.list_jobs())
+
+
+def test_failed_job_still_advances(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    store.save(_job("boom"))
+    scheduler = Scheduler(store, str(tmp_dir))
+
+    async def failing_action(job):
+        raise RuntimeError("boom")
+
+    scheduler._execute_action = failing_action
+    asyncio.run(scheduler._tick())
+
+    [job] = store.list_jobs()
+    assert job.run_count == 1
+    assert job.next_run_at > time.time()
+
+
+def test_command_action_runs_with_args(tmp_dir):
+    out = tmp_dir / "out.txt"
+    scheduler = Scheduler(JobStore(str(tmp_dir)), str(tmp_dir))
+    config = {"command": "sh", "args": ["-c", f"echo hi > {out}"]}
+
+    asyncio.run(scheduler._action_command(config))
+
+    assert out.read_text().strip() == "hi"
+
+
+def test_command_timeout_kills_process_group(tmp_dir):
+    marker = tmp_dir / "survived"
+    scheduler = Scheduler(JobStore(str(tmp_dir)), str(tmp_dir))
+    config = {
+        "command": "sh",
+        "args": ["-c", f"(sleep 1; touch {marker}) & wait"],
+        "timeout": 0.2,
+    }
+
+    asyncio.run(scheduler._action_command(config))
+    time.sleep(1.3)
+
+    assert not marker.exists()
+
+
+def test_webhook_sends_body_and_headers(tmp_dir):
+    received = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            received["body"] = self.rfile.read(length)
+            received["content_type"] = self.headers["Content-Type"]
+            received["token"] = self.headers["X-Token"]
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+
+    scheduler = Scheduler(JobStore(str(tmp_dir)), str(tmp_dir))
+    config = {
+        "url": f"http://127.0.0.1:{server.server_port}/hook",
+        "headers": {"X-Token": "abc"},
+        "body": '{"ok": true}',
+    }
+
+    async def fire():
+        await scheduler._action_webhook(config)
+        await scheduler.stop()
+
+    asyncio.run(fire())
+    thread.join(timeout=5)
+    server.server_close()
+
+    assert received == {
+        "body": b'{"ok": true}',
+        "content_type": "application/json",
+        "token": "abc",
+    }
+
+
+def test_unschedulable_job_is_disabled_not_rerun(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    job = Job(
+        name="feb31",
+        schedule=Schedule(type=ScheduleType.CRON, expression="0 0 31 2 *"),
+        action=JobAction(type="command", config={"command": "true"}),
+        next_run_at=time.time() - 1,
+    )
+    store.save(job)
+    scheduler = Scheduler(store, str(tmp_dir))
+    runs = []
+
+    async def record(job):
+        runs.append(job.id)
+
+    scheduler._execute_action = record
+    asyncio.run(scheduler._tick())
+    asyncio.run(scheduler._tick())
+
+    assert runs == [job.id]
+    stored = store.get(job.id)
+    assert stored.run_count == 1
+    assert stored.status is JobStatus.DISABLED
+
+
+async def _sleep_briefly(scheduler, **kwargs) -> str:
+    try:
+        await asyncio.wait_for(scheduler._sleep_until_next(**kwargs), timeout=1.0)
+    except asyncio.TimeoutError:
+        return "slept"
+    return "woke"
+
+
+def test_sleep_is_short_when_jobs_are_overdue(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    store.save(_job("overdue"))
+    scheduler = Scheduler(store, str(tmp_dir))
+
+    assert asyncio.run(_sleep_briefly(scheduler)) == "woke"
+
+
+def test_sleep_polls_after_failed_mark(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    store.save(_job("stuck"))
+    scheduler = Scheduler(store, str(tmp_dir))
+
+    def broken_mark_runs(job_ids):
+        raise RuntimeError("database is locked")
+
+    async def noop(job):
+        pass
+
+    scheduler._execute_action = noop
+    store.mark_runs = broken_mark_runs
+    assert asyncio.run(scheduler._tick()) is False
+    assert asyncio.run(_sleep_briefly(scheduler, poll_only=True)) == "slept"
+
+
+def test_backlog_beyond_tick_limit_is_drained(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    for i in range(150):
+        store.save(_job(f"job{i}"))
+    scheduler = Scheduler(store, str(tmp_dir))
+    ran = []
+
+    async def record(job):
+        ran.append(job.id)
+
+    scheduler._execute_action = record
+
+    async def run_for_a_bit():
+        task = asyncio.create_task(scheduler.run())
+        deadline = time.monotonic() + 5
+        while len(ran) < 150 and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        await scheduler.stop()
+        await task
+
+    asyncio.run(run_for_a_bit())
+    assert len(set(ran)) == 150
+
+
+@pytest.mark.parametrize("client", ["httpx", "urllib"])
+def test_webhook_follows_redirects(tmp_dir, monkeypatch, client):
+    if client == "httpx":
+        pytest.importorskip("httpx")
+    else:
+        monkeypatch.setattr(scheduler_module, "httpx", None)
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if self.path == "/old":
+                self.send_response(301)
+                self.send_header("Location", "/new")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    scheduler = Scheduler(JobStore(str(tmp_dir)), str(tmp_dir))
+    config = {"url": f"http://127.0.0.1:{server.server_port}/old", "method": "GET"}
+
+    async def fire():
+        await scheduler._action_webhook(config)
+        used_pool = scheduler._http is not None
+        await scheduler.stop()
+        return used_pool
+
+    used_pool = asyncio.run(fire())
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+    assert hits == ["/old", "/new"]
+    assert used_pool is (client == "httpx")
@@ -0,0 +1,208 @@
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "packages" / "almanac"))
+
+from almanac.models import Job, JobAction, JobStatus, Schedule, ScheduleType
+from almanac.store import _SELECT_DUE_JOBS, JobStore, _parse_cron, compute_next_cron
+
+
+def _ts(*args) -> float:
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def test_parse_cron_is_cached():
+    _parse_cron.cache_clear()
+    first = _parse_cron("*/15 9-17 * * 0-4")
+    second = _parse_cron("*/15 9-17 * * 0-4")
+    assert first is second
+    assert first[0] == (1 << 0) | (1 << 15) | (1 << 30) | (1 << 45)
+    assert _parse_cron.cache_info().hits == 1
+
+
+def test_parse_cron_collapses_full_range_fields():
+    minutes, hours, dom, months, dow = _parse_cron("0-59 1-12,0,10-23 * */1 0,1,2,3,4,5,6")
+    assert (minutes, hours, dom, months, dow) == (None, None, None, None, None)
+    assert _parse_cron("1-59 * * * *")[0] == (1 << 60) - 2
+
+
+def test_parse_cron_rejects_bad_expression():
+    with pytest.raises(ValueError):
+        _parse_cron("* * *")
+
+
+@pytest.mark.parametrize("expression", ["60 * * * *", "0 24 * * *"])
+def test_next_cron_rejects_out_of_range_values(expression):
+    with pytest.raises(ValueError):
+        compute_next_cron(expression, after=_ts(2026, 3, 10, 12, 0))
+
+
+def test_next_cron_daily():
+    after = _ts(2026, 3, 10, 12, 30)
+    assert compute_next_cron("0 9 * * *", after=after) == _ts(2026, 3, 11, 9, 0)
+
+
+def test_next_cron_skips_current_minute():
+    after = _ts(2026, 3, 10, 9, 0, 30)
+    assert compute_next_cron("0 9 * * *", after=after) == _ts(2026, 3, 11, 9, 0)
+
+
+def test_next_cron_weekday_and_month():
+    # 2026-03-10 is a Tuesday; next Monday (0) in April at 08:15
+    after = _ts(2026, 3, 10, 12, 0)
+    assert compute_next_cron("15 8 * 4 0", after=after) == _ts(2026, 4, 6, 8, 15)
+
+
+def test_next_cron_leap_day():
+    after = _ts(2027, 1, 1, 0, 0)
+    assert compute_next_cron("0 0 29 2 *", after=after) == _ts(2028, 2, 29, 0, 0)
+
+
+def test_next_cron_rolls_over_year_and_hour():
+    after = _ts(2026, 12, 31, 23, 59)
+    assert compute_next_cron("*/20 * * * *", after=after) == _ts(2027, 1, 1, 0, 0)
+    after = _ts(2026, 6, 1, 10, 50)
+    assert compute_next_cron("10,20 10-11 * * *", after=after) == _ts(2026, 6, 1, 11, 10)
+
+
+def test_next_cron_unreachable():
+    # Feb 31st never exists
+    with pytest.raises(ValueError):
+        compute_next_cron("0 0 31 2 *", after=_ts(2026, 1, 1))
+
+
+def _job(name: str, next_run_at: float) -> Job:
+    return Job(
+        name=name,
+        schedule=Schedule(type=ScheduleType.INTERVAL, expression="60"),
+        action=JobAction(type="command", config={"command": "true"}),
+        next_run_at=next_run_at,
+    )
+
+
+def test_get_due_jobs_ordered_and_limited(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    now = time.time()
+    store.save(_job("later", now - 10))
+    store.save(_job("earliest", now - 100))
+    store.save(_job("future", now + 3600))
+
+    due = store.get_due_jobs()
+    assert [j.name for j in due] == ["earliest", "later"]
+
+    assert [j.name for j in store.get_due_jobs(limit=1)] == ["earliest"]
+
+
+def test_get_due_jobs_uses_index(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    conn = store._conn
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN " + _SELECT_DUE_JOBS, (time.time(), 100)
+    ).fetchall()
+    assert any("idx_jobs_next_run" in row[3] for row in plan)
+
+
+def test_get_next_fire_time(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    assert store.get_next_fire_time() is None
+
+    now = time.time()
+    store.save(_job("soon", now + 60))
+    store.save(_job("later", now + 3600))
+    assert store.get_next_fire_time() == now + 60
+
+
+def test_mark_runs_batch(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    now = time.time()
+    repeating = _job("repeating", now - 1)
+    once = Job(
+        name="once",
+        schedule=Schedule(type=ScheduleType.ONCE, expression=str(now + 5)),
+        action=JobAction(type="command", config={"command": "true"}),
+        next_run_at=now - 1,
+    )
+    store.save(repeating)
+    store.save(once)
+
+    store.mark_runs([repeating.id, once.id])
+
+    r = store.get(repeating.id)
+    assert r.run_count == 1
+    assert r.next_run_at >= now + 60
+
+    o = store.get(once.id)
+    assert o.run_count == 1
+    assert o.next_run_at is None
+    assert store.get_due_jobs() == []
+
+
+def test_connection_pragmas(tmp_dir):
+    conn = JobStore(str(tmp_dir))._conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -20000
+
+
+def test_mark_run_per_schedule_type(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    now = time.time()
+    interval = _job("interval", now - 1)
+    cron = Job(
+        name="cron",
+        schedule=Schedule(type=ScheduleType.CRON, expression="0 9 * * *"),
+        action=JobAction(type="command", config={"command": "true"}),
+        next_run_at=now - 1,
+    )
+    once = Job(
+        name="once",
+        schedule=Schedule(type=ScheduleType.ONCE, expression=str(now + 5)),
+        action=JobAction(type="command", config={"command": "true"}),
+        next_run_at=now - 1,
+    )
+    for job in (interval, cron, once):
+        store.save(job)
+        store.mark_run(job.id)
+
+    i = store.get(interval.id)
+    assert i.run_count == 1
+    assert i.next_run_at == pytest.approx(i.last_run_at + 60)
+
+    c = store.get(cron.id)
+    assert c.next_run_at == compute_next_cron("0 9 * * *", after=c.last_run_at)
+
+    o = store.get(once.id)
+    assert o.next_run_at is None
+    assert o.status is JobStatus.DISABLED
+
+    store.mark_run("missing")  # no-op
+
+
+def test_save_many(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    jobs = [_job(f"bulk{i}", None) for i in range(50)]
+
+    store.save_many(jobs)
+
+    listed = store.list_jobs()
+    assert len(listed) == 50
+    assert all(j.next_run_at is not None for j in listed)
+
+
+def test_write_waits_for_concurrent_writer(tmp_dir):
+    store = JobStore(str(tmp_dir))
+    other = sqlite3.connect(str(tmp_dir / "almanac" / "jobs.db"), check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.2, other.commit).start()
+
+    store.save(_job("contended", time.time() + 60))
+
+    assert [j.name for j in store.list_jobs()] == ["contended"]
+    other.close()
@@ -42,3 +42,29 @@ def test_creates_parent_dirs(tmp_dir):
     assert db_path.exists()
 
     conn.close()
+
+
+def test_connection_pragmas(tmp_dir):
+    """Commit-heavy writers get NORMAL sync and an in-memory temp store."""
+    conn = get_connection(tmp_dir / "test_pragmas.db")
+
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+
+    conn.close()
+
+
+def test_insert_rows_chunks(tmp_dir):
+    """Rows are split into multi-row statements and all land in order."""
+    from common.db import insert_rows
+
+    conn = get_connection(tmp_dir / "test_insert.db")
+    conn.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+    rows = [(i, f"r{i}") for i in range(1234)]
+
+    insert_rows(conn, "t", ("a", "b"), rows, chunk=500)
+    conn.commit()
+
+    assert [tuple(r) for r in conn.execute("SELECT a, b FROM t ORDER BY rowid")] == rows
+    conn.close()
@@ -51,3 +51,98 @@ def test_pending_and_mark_processed(tmp_path):
     bus.mark_processed(event.id)
     pending = bus.pending("job.due")
     assert len(pending) == 0
+
+
+def test_publish_many(tmp_path):
+    bus = EventBus(tmp_path / "events.db")
+    received = []
+    bus.subscribe("batch.*", received.append)
+    bus.publish("other.thing")
+
+    events = bus.publish_many([("batch.a", {"n": 1}), ("batch.b", None)], source="test")
+
+    assert [e.topic for e in events] == ["batch.a", "batch.b"]
+    assert received == events
+    stored = {e.id: e for e in bus.history("batch.*")}
+    assert stored[events[0].id].payload == {"n": 1}
+    assert stored[events[1].id].topic == "batch.b"
+
+
+def test_subscribe_literal_and_glob(tmp_path):
+    bus = EventBus(tmp_path / "events.db")
+    literal, glob = [], []
+    bus.subscribe("task.created", literal.append)
+    bus.subscribe("task.?pdated", glob.append)
+    bus.subscribe("task.[cu]*", glob.append)
+
+    bus.publish("task.created")
+    bus.publish("task.updated")
+    bus.publish("task.createdX")
+
+    assert [e.topic for e in literal] == ["task.created"]
+    assert sorted(e.topic for e in glob) == [
+        "task.created", "task.createdX", "task.updated", "task.updated",
+    ]
+
+
+def test_history_question_mark_pattern(tmp_path):
+    bus = EventBus(tmp_path / "events.db")
+    bus.publish("job.a1")
+    bus.publish("job.b1")
+    bus.publish("job.abc")
+
+    assert sorted(e.topic for e in bus.history("job.?1")) == ["job.a1", "job.b1"]
+
+
+def test_background_writer(tmp_path):
+    bus = EventBus(tmp_path / "events.db", background=True)
+    received = []
+    bus.subscribe("bg.*", received.append)
+
+    events = [bus.publish("bg.tick", {"n": i}) for i in range(250)]
+    assert len(received) == 250
+
+    bus.flush()
+    assert len({e.id for e in events}) == 250
+    assert all(e.id is not None for e in events)
+
+    history = bus.history("bg.tick", limit=500)
+    assert sorted(e.payload["n"] for e in history) == list(range(250))
+    bus.close()
+
+
+def test_history_glob_filters_before_limit(tmp_path):
+    bus = EventBus(tmp_path / "events.db")
+    for i in range(5):
+        bus.publish("task.created", {"i": i})
+    for i in range(5):
+        bus.publish("session.created", {"i": i})
+
+    recent = bus.history("task.*", limit=3)
+    assert [e.payload["i"] for e in recent] == [4, 3, 2]
+    assert [e.topic for e in bus.history("[!t]*.created")] == ["session.created"] * 5
+
+
+def test_async_handlers(tmp_path):
+    import asyncio
+
+    bus = EventBus(tmp_path / "events.db")
+    received = []
+
+    async def handler(event):
+        await asyncio.sleep(0)
+        received.append(event.topic)
+
+    bus.subscribe("async.*", handler)
+
+    # No running loop: the coroutine is run to completion inline.
+    bus.publish("async.sync_caller")
+    assert received == ["async.sync_caller"]
+
+    async def main():
+        bus.publish("async.in_loop")
+        assert received == ["async.sync_caller"]
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert received == ["async.sync_caller", "async.in_loop"]
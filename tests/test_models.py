@@ -1,4 +1,4 @@
-from common.models import AgentIdentity, AGENTS, format_agent_message
+from common.models import AgentIdentity, AGENTS, LogEntry, format_agent_message
 
 
 def test_agent_identity():
@@ -47,3 +47,22 @@ def test_format_agent_message_unknown():
     """Unknown agent gets bracketed name."""
     result = format_agent_message("mystery", "Who am I?")
     assert result == "<b>[mystery]</b>\n\nWho am I?"
+
+
+def test_log_entry_decodes_data_lazily():
+    """Raw JSON is kept as text until .data is read, then decoded once."""
+    from common.models import RawJSON
+
+    entry = LogEntry(timestamp=1.0, level="INFO", source="x", message="m",
+                     data=RawJSON('{"k": [1, 2]}'))
+    assert type(entry._data) is RawJSON
+
+    assert entry.data == {"k": [1, 2]}
+    assert entry.data is entry.data
+    assert LogEntry(timestamp=1.0, level="INFO", source="x", message="m").data is None
+
+
+def test_format_agent_message_late_registration(monkeypatch):
+    """Agents added to AGENTS after import still get their prefix."""
+    monkeypatch.setitem(AGENTS, "scout", AgentIdentity("scout", "Scout", "*", "grok"))
+    assert format_agent_message("scout", "hi") == "* <b>Scout</b>\n\nhi"
@@ -1,4 +1,8 @@
-from common.outbox import post_message, get_pending, mark_sent, mark_failed
+import sqlite3
+from pathlib import Path
+
+import pytest
+from common.outbox import get_pending, mark_failed, mark_sent, post_message
 
 
 def test_post_and_get_pending(db_path):
@@ -58,3 +62,45 @@ def test_multiple_pending(db_path):
     assert pending[0].message == "msg 0"
     assert pending[1].message == "msg 1"
     assert pending[2].message == "msg 2"
+
+
+def test_connection_is_reused(db_path):
+    """Repeated calls against one path share a single connection."""
+    from common import outbox
+
+    post_message(db_path, chat_id=1, agent_name="herald", message="a")
+    conn = outbox._CONNS[str(Path(db_path).resolve())]
+    post_message(db_path, chat_id=1, agent_name="herald", message="b")
+    get_pending(db_path)
+
+    assert outbox._CONNS[str(Path(db_path).resolve())] is conn
+
+
+def test_post_messages_batch(db_path):
+    """A batch lands in one go and keeps its order."""
+    from common.outbox import post_messages
+
+    post_messages(db_path, [(7, "steward", f"m{i}", "HTML") for i in range(3)])
+
+    assert [m.message for m in get_pending(db_path)] == ["m0", "m1", "m2"]
+
+
+@pytest.mark.parametrize("mark", [mark_sent, mark_failed])
+def test_busy_mark_does_not_wedge_connection(db_path, mark):
+    """A mark that hits a locked database leaves the shared connection usable."""
+    from common import outbox
+
+    post_message(db_path, chat_id=1, agent_name="herald", message="a")
+    msg_id = get_pending(db_path)[0].id
+    outbox._CONNS[str(Path(db_path).resolve())].execute("PRAGMA busy_timeout=0")
+
+    locker = sqlite3.connect(db_path)
+    locker.execute("BEGIN IMMEDIATE")
+    with pytest.raises(sqlite3.OperationalError):
+        mark(db_path, msg_id)
+    locker.rollback()
+    locker.close()
+
+    post_message(db_path, chat_id=1, agent_name="herald", message="b")
+    post_message(db_path, chat_id=1, agent_name="herald", message="c")
+    assert [m.message for m in get_pending(db_path)] == ["a", "b", "c"]
@@ -77,3 +77,47 @@ def test_no_frontmatter(skills_dir):
     assert skill.description == ""
     assert skill.tags == []
     assert skill.content == "Just some content"
+
+
+def _spy_parse(monkeypatch) -> list:
+    """Record every path SkillManager._parse is called with."""
+    calls = []
+    original = SkillManager._parse
+
+    def spy(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(SkillManager, "_parse", staticmethod(spy))
+    return calls
+
+
+def test_parse_is_cached_until_file_changes(skills_dir, monkeypatch):
+    """Unchanged files are not re-read; edits are picked up."""
+    mgr = SkillManager(skills_dir)
+    mgr.save("cached", "v1", "body")
+
+    calls = _spy_parse(monkeypatch)
+
+    assert mgr.get("cached").description == "v1"
+    assert mgr.list_skills()[0].description == "v1"
+    mgr.search("cached")
+    assert len(calls) == 1
+
+    mgr.save("cached", "version two", "body")
+    assert mgr.get("cached").description == "version two"
+    assert len(calls) == 2
+
+
+def test_get_reads_only_the_named_file(skills_dir, monkeypatch):
+    """A saved skill is found without parsing the rest of the library."""
+    mgr = SkillManager(skills_dir)
+    for i in range(5):
+        mgr.save(f"Other Skill {i}", "", "body")
+    mgr.save("Target Skill", "found", "body")
+
+    fresh = SkillManager(skills_dir)
+    calls = _spy_parse(monkeypatch)
+
+    assert fresh.get("Target Skill").description == "found"
+    assert [p.name for p in calls] == ["target-skill.md"]
@@ -1,7 +1,7 @@
 import logging
 import time
 
-from common.watchtower import Watchtower, WatchtowerHandler
+from common.watchtower import _SUMMARY, Watchtower, WatchtowerHandler
 
 
 def test_log_and_query(db_path):
@@ -110,3 +110,70 @@ def test_watchtower_handler(db_path):
 
     # Clean up handler to avoid polluting other tests
     logger.removeHandler(handler)
+
+
+def test_log_many(db_path):
+    """Batch-written entries come back from query."""
+    from common.models import LogEntry
+
+    wt = Watchtower(db_path)
+    now = time.time()
+    wt.log_many(
+        [
+            LogEntry(timestamp=now, level="INFO", source="batch", message="one"),
+            LogEntry(timestamp=now + 1, level="ERROR", source="batch", message="two",
+                     data={"k": 1}),
+        ]
+    )
+
+    entries = wt.query(source="batch")
+    assert [e.message for e in entries] == ["two", "one"]
+    assert entries[0].data == {"k": 1}
+
+
+def test_data_stored_compact(db_path):
+    """Structured data is stored without padding or ASCII escapes."""
+    wt = Watchtower(db_path)
+    wt.log("INFO", "compact", "msg", data={"city": "Zürich", "n": 1})
+
+    raw = wt._conn.execute("SELECT data_json FROM logs").fetchone()[0]
+    assert raw == '{"city":"Zürich","n":1}'
+    assert wt.query(source="compact")[0].data == {"city": "Zürich", "n": 1}
+
+
+def test_deferred_commit(db_path):
+    """Entries logged with commit=False become visible after commit()."""
+    wt = Watchtower(db_path)
+    for i in range(3):
+        wt.log("INFO", "deferred", f"m{i}", commit=False)
+
+    other = Watchtower(db_path)
+    assert other.query(source="deferred") == []
+
+    wt.commit()
+    assert len(other.query(source="deferred")) == 3
+
+
+def test_log_many_after_deferred_log(db_path):
+    """log_many() joins a transaction left open by log(commit=False)."""
+    from common.models import LogEntry
+
+    wt = Watchtower(db_path)
+    wt.log("INFO", "mixed", "deferred", commit=False)
+    wt.log_many([LogEntry(timestamp=time.time(), level="INFO", source="mixed", message="batch")])
+
+    other = Watchtower(db_path)
+    assert sorted(e.message for e in other.query(source="mixed")) == ["batch", "deferred"]
+
+
+def test_summary_groups_by_top_level_source(db_path):
+    """Sub-sources roll up into their top-level source."""
+    wt = Watchtower(db_path)
+    wt.log("INFO", "herald.bot", "a")
+    wt.log("INFO", "herald.main", "b")
+    wt.log("WARNING", "herald.bot.poll", "c")
+
+    assert wt.summary(hours=1) == {"herald": {"INFO": 2, "WARNING": 1}}
+
+    plan = wt._conn.execute("EXPLAIN QUERY PLAN " + _SUMMARY, (0,)).fetchall()
+    assert any("COVERING INDEX idx_logs_ts_src_level" in row[3] for row in plan)